@@ -0,0 +1,107 @@
+import hashlib
+import os
+import pickle
+import shutil
+
+import pandas as pd
+from scipy import sparse
+
+
+def content_digest(df, arrays=()):
+    # Hash of the column names, the values and the index of a frame, plus any extra numpy arrays
+    digest = hashlib.sha256()
+    digest.update(repr(list(df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    for array in arrays:
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+class ArtifactCache:
+    # Stage outputs saved on disk under a key made of the hash of the stage input and the stage parameters
+    # Frames are stored as parquet (pickle without pyarrow), sparse matrices as npz and everything else as pickle
+    # The least recently used entries are evicted when the cache grows over max_bytes
+    def __init__(self, directory='artifact_cache', max_bytes=2 * 1024 ** 3):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(*parts):
+        return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+    def load(self, key):
+        path = os.path.join(self.directory, key)
+        if not os.path.isdir(path):
+            self.misses += 1
+            return None
+
+        items = {}
+        for file_name in os.listdir(path):
+            name, extension = os.path.splitext(file_name)
+            file_path = os.path.join(path, file_name)
+            if extension == '.parquet':
+                items[name] = pd.read_parquet(file_path)
+            elif extension == '.npz':
+                items[name] = sparse.load_npz(file_path)
+            else:
+                with open(file_path, 'rb') as f:
+                    items[name] = pickle.load(f)
+
+        # Mark the entry as recently used
+        os.utime(path)
+        self.hits += 1
+        return items
+
+    def save(self, key, items):
+        # Write to a temporary directory first, so a crashed run never leaves a half written entry
+        path = os.path.join(self.directory, key)
+        tmp_path = f'{path}.tmp'
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+
+        for name, value in items.items():
+            file_path = os.path.join(tmp_path, name)
+            if isinstance(value, pd.DataFrame):
+                try:
+                    value.to_parquet(f'{file_path}.parquet')
+                    continue
+                except (ImportError, ValueError, TypeError):
+                    if os.path.exists(f'{file_path}.parquet'):
+                        os.remove(f'{file_path}.parquet')
+            if sparse.issparse(value):
+                sparse.save_npz(f'{file_path}.npz', sparse.csr_matrix(value))
+            else:
+                with open(f'{file_path}.pkl', 'wb') as f:
+                    pickle.dump(value, f)
+
+        shutil.rmtree(path, ignore_errors=True)
+        os.rename(tmp_path, path)
+        self.evict()
+
+    def entries(self):
+        # (last use time, size in bytes, path) of every entry
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+        for key in os.listdir(self.directory):
+            path = os.path.join(self.directory, key)
+            if os.path.isdir(path) and not key.endswith('.tmp'):
+                size = sum(os.path.getsize(os.path.join(path, file_name)) for file_name in os.listdir(path))
+                entries.append((os.path.getmtime(path), size, path))
+        return entries
+
+    def evict(self):
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def cache_info(self):
+        entries = self.entries()
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(entries),
+                'bytes': sum(size for _, size, _ in entries)}
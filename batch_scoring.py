@@ -0,0 +1,37 @@
+import os
+
+import pandas as pd
+
+from data_access import table_to_frame
+
+
+def read_batches(path, batch_size=10000, columns=None):
+    # Parquet files are read one record batch at a time, so memory is bounded by batch_size
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        for record_batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+            yield table_to_frame(record_batch)
+
+    # Pickles can only be loaded whole, they are still transformed and predicted batch by batch
+    else:
+        df = pd.read_pickle(path)
+        if columns is not None:
+            df = df[columns]
+        for start in range(0, len(df), batch_size):
+            yield df.iloc[start:start + batch_size]
+
+
+def score_in_batches(pipeline, model, input_path, output_path, batch_size=10000, columns=None):
+    # Transform and predict every batch with the fitted pipeline and append the predictions to the output csv, only
+    # the columns the pipeline reads need to be loaded
+    if os.path.exists(output_path):
+        os.remove(output_path)
+
+    n_rows = 0
+    for batch in read_batches(input_path, batch_size, columns):
+        predictions = pd.DataFrame({'y': model.predict(pipeline.transform(batch))})
+        predictions.to_csv(output_path, mode='a', header=n_rows == 0, index=False)
+        n_rows += len(batch)
+    return n_rows
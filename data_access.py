@@ -0,0 +1,70 @@
+import os
+
+import pandas as pd
+
+from time_features import DATE_LIST_COLUMNS, RaggedDates
+
+# The raw pickles are converted once into parquet files in DATA_DIR, every path can be set with an environment variable
+DATA_DIR = os.environ.get('ML_DATA_DIR', 'data')
+RAW_PICKLES = {'train': os.environ.get('ML_TRAIN_PICKLE', r"C:\Users\tamar\Downloads\XY_train.pkl"),
+               'test': os.environ.get('ML_TEST_PICKLE', r"C:\Users\tamar\Downloads\X_test (1).pkl")}
+
+
+def dataset_path(name):
+    return os.path.join(DATA_DIR, f'{name}.parquet')
+
+
+def date_list_array(dates, missing):
+    # Date lists as a native arrow list<timestamp> column, missing lists are nulls
+    import pyarrow as pa
+
+    return pa.LargeListArray.from_arrays(pa.array(dates.offsets), pa.array(dates.values), mask=pa.array(missing))
+
+
+def convert_pickle(pickle_path, parquet_path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    df = pd.read_pickle(pickle_path)
+    date_lists = {}
+    for column in DATE_LIST_COLUMNS:
+        if column in df.columns:
+            date_lists[column] = date_list_array(RaggedDates.from_lists(df[column]), df[column].isnull().to_numpy())
+
+    table = pa.Table.from_pandas(df.drop(columns=list(date_lists)))
+    for column, array in date_lists.items():
+        table = table.append_column(column, array)
+
+    os.makedirs(os.path.dirname(parquet_path) or '.', exist_ok=True)
+    pq.write_table(table, parquet_path)
+
+
+def ensure_dataset(name):
+    # Convert the raw pickle the first time the dataset is used
+    path = dataset_path(name)
+    if not os.path.exists(path):
+        convert_pickle(RAW_PICKLES[name], path)
+    return path
+
+
+def arrow_list_dtype(data_type):
+    # types_mapper of Table.to_pandas: list columns stay arrow lists (pd.ArrowDtype) instead of a numpy array per row,
+    # the other columns get their default pandas dtype
+    import pyarrow as pa
+
+    if pa.types.is_list(data_type) or pa.types.is_large_list(data_type):
+        return pd.ArrowDtype(data_type)
+    return None
+
+
+def table_to_frame(table):
+    return table.to_pandas(types_mapper=arrow_list_dtype)
+
+
+def load_dataset(name, columns=None):
+    # Only the requested columns are read, through a memory map of the parquet file
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(ensure_dataset(name), columns=columns, memory_map=True, use_pandas_metadata=True)
+    return table_to_frame(table)
+
@@ -0,0 +1,361 @@
+import pickle
+import re
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from nltk import SnowballStemmer
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.preprocessing import MaxAbsScaler
+
+from artifact_cache import ArtifactCache, content_digest
+from feature_scoring import FeatureRanking
+from imputation import fit_distributions, fill_from_distribution, cross_fill
+from ngram_hashing import make_hashing_vectorizer, hashed_feature_names, hash_in_chunks, hashing_collision_report
+from seeding import new_seed, row_keys, row_uniforms
+from stemming import CachedStemmer
+from text_cleaning import tokenize_and_count, clean_token_lists
+from time_features import time_difference_statistics, to_ragged_dates
+
+# Rows missing one of these columns cannot be imputed
+REQUIRED_COLUMNS = ['textID', 'text', 'sentiment', 'message_date', 'account_creation_date',
+                    'previous_messages_dates', 'date_of_new_follower', 'date_of_new_follow']
+# Raw columns the pipeline reads, the datasets are loaded with only these (and the 'sentiment' labels for the fit)
+INPUT_COLUMNS = ['textID', 'text', 'gender', 'email', 'email_verified', 'blue_tick', 'embedded_content', 'platform',
+                 'message_date', 'account_creation_date', 'previous_messages_dates', 'date_of_new_follower',
+                 'date_of_new_follow']
+COLUMNS_TO_NORMALIZE = ['message_length', 'num_messages_sent', 'follower_count', 'following_count', 'seniority']
+STAGES = ['preprocess', 'extract', 'represent']
+ONEHOT_PREFIXES = {'email_domain_ending': 'email_ending', 'embedded_content': 'embedded_content',
+                   'platform': 'platform', 'message_time_category': 'message_time'}
+IMPUTED_COLUMNS = ['embedded_content', 'platform', 'gender']
+BINARY_MAPPINGS = {'gender': {'F': 1, 'M': 0}, 'email_verified': {True: 1, False: 0}, 'blue_tick': {True: 1, False: 0}}
+
+
+def drop_incomplete_rows(df):
+    # Drop rows with missing values exceeding a threshold
+    df = df.dropna(thresh=df.shape[1] - 2)
+
+    # Delete the rows with missing values that the pipeline cannot impute
+    return df.dropna(subset=[column for column in REQUIRED_COLUMNS if column in df.columns])
+
+
+def categorize_hour(hour):
+    if 6 <= hour < 12:  # 6:00 AM to 11:59 AM
+        return 'Morning'
+    elif 12 <= hour < 18:  # 12:00 PM to 5:59 PM
+        return 'Noon'
+    elif 18 <= hour < 24:  # 6:00 PM to 11:59 PM
+        return 'Evening'
+    else:
+        return 'Night'
+
+
+def extract_email_domain_ending(email):
+    if pd.isnull(email):
+        return 'Missing'
+    match = re.search(r'\.(\w+)$', email)
+    if match:
+        return match.group(1)
+    else:
+        return 'Unknown'
+
+
+class FeaturePipeline:
+    # Fits preprocessing, feature extraction, representation and selection on the training data once,
+    # and keeps all the fitted state so test data only needs to be transformed
+    def __init__(self, k=10, max_features=100, h_pct=0.05, l_pct=0.05, time_statistics=(), stemmer=None,
+                 n_jobs=1, chunk_size=10000, sparse_output=False, vectorizer_cache=None,
+                 ngram_mode='count', n_hashed_features=2 ** 12, score_func='chi2', random_state=None,
+                 artifact_cache=None, compact_dtypes=False):
+        self.k = k
+        self.max_features = max_features
+        self.h_pct = h_pct
+        self.l_pct = l_pct
+        # Optional timing features of the previous messages: 'mean', 'median', 'std' and 'burstiness'
+        self.time_statistics = list(time_statistics)
+        self.stemmer = stemmer if stemmer is not None else CachedStemmer(SnowballStemmer('english'))
+        # With n_jobs > 1 the text is tokenized in blocks of chunk_size rows in a process pool
+        self.n_jobs = n_jobs
+        self.chunk_size = chunk_size
+        # With sparse_output the selected features are returned as a CSR matrix instead of a DataFrame
+        self.sparse_output = sparse_output
+        # A VectorizerCache reuses the fitted n-gram vocabulary and matrix of a previous run over the same text
+        self.vectorizer_cache = vectorizer_cache
+        # 'count' fits a CountVectorizer vocabulary of max_features n-grams, 'hashing' hashes all the n-grams into
+        # n_hashed_features columns (see collision_report_ or ngram_hashing.hashing_collision_report to choose the
+        # dimension)
+        if ngram_mode not in ('count', 'hashing'):
+            raise ValueError(f"ngram_mode must be 'count' or 'hashing', got '{ngram_mode}'")
+        self.ngram_mode = ngram_mode
+        self.n_hashed_features = n_hashed_features
+        # The k best features are selected by 'chi2' or 'fisher' score
+        if score_func not in ('chi2', 'fisher'):
+            raise ValueError(f"score_func must be 'chi2' or 'fisher', got '{score_func}'")
+        self.score_func = score_func
+        # Every stochastic stage draws from its own child seed of random_state mixed with the key of each row, so the
+        # value drawn for a row only depends on that row and the parameters, not on the other rows of the batch
+        # None picks a new seed for this pipeline
+        self.random_state = random_state if random_state is not None else new_seed()
+        # An ArtifactCache skips the fit of the preprocessing, extraction and representation stages whose input and
+        # parameters did not change since a previous run
+        self.artifact_cache = artifact_cache
+        # With compact_dtypes the represented matrix is float32, and the selected binary and one-hot columns are
+        # uint8 and the continuous ones float32, instead of float64 for all of them
+        self.compact_dtypes = compact_dtypes
+
+    def fit(self, df):
+        self.fit_represent(df)
+        return self
+
+    def fit_transform(self, df):
+        X, Y = self.fit_represent(df)
+        return self.select(X, Y.index), Y
+
+    def transform(self, df):
+        return self.select(self.represent(df), df.index)
+
+    def fit_represent(self, df):
+        # Fit all the stages and rank the features once, the represented matrix has all the features
+        X, Y = self._run_stages(df, fit=True)
+        self.ranking_ = FeatureRanking(X, Y, self.feature_names_, self.score_func)
+        self.set_k(self.k)
+        return X, Y
+
+    def represent(self, df):
+        return self._run_stages(df, fit=False)[0]
+
+    def _run_stages(self, df, fit):
+        df, dates = to_ragged_dates(df)
+
+        # Resume after the last stage whose output is in the artifact cache, the fitted state of the stages up to it
+        # is saved with it
+        keys = self._stage_keys(df, dates, fit)
+        outputs = {}
+        start = 0
+        for i in reversed(range(len(STAGES))):
+            cached = self.artifact_cache.load(keys[i]) if keys is not None else None
+            if cached is not None:
+                self.__dict__.update(cached.pop('state'))
+                outputs = cached
+                start = i + 1
+                break
+
+        for i in range(start, len(STAGES)):
+            outputs = self._run_stage(STAGES[i], outputs, df, dates, fit)
+            if keys is not None:
+                self.artifact_cache.save(keys[i], dict(outputs, state=self._fitted_state()))
+
+        return outputs['matrix'], outputs['target']['sentiment'] if fit else None
+
+    def _run_stage(self, stage, outputs, df, dates, fit):
+        if stage == 'preprocess':
+            return {'frame': self._preprocess(df, fit)}
+        if stage == 'extract':
+            frame, ngrams = self._extract_features(outputs['frame'], dates, fit)
+            return {'frame': frame, 'ngrams': ngrams}
+        outputs = {'matrix': self._represent(outputs['frame'], outputs['ngrams'], fit)}
+        if fit:
+            outputs['target'] = df[['sentiment']]
+        return outputs
+
+    def _stage_keys(self, df, dates, fit):
+        # Every stage key chains the key of the stage before it with the parameters of the stage
+        # Only the fit is cached, transforms of new data (like every batch of a scoring job) would fill the cache with
+        # entries that are never read again and evict the fit. Seniority depends on the current date, so it is part of
+        # the key
+        if self.artifact_cache is None or not fit:
+            return None
+        data = content_digest(df, [array for ragged in dates.values() for array in (ragged.offsets, ragged.values)])
+        preprocess = ArtifactCache.key(data, 'fit', 'preprocess', self.h_pct, self.l_pct, self.random_state)
+        extract = ArtifactCache.key(preprocess, 'extract', self.max_features, self.ngram_mode, self.n_hashed_features,
+                                    self.time_statistics, date.today())
+        represent = ArtifactCache.key(extract, 'represent', self.compact_dtypes)
+        return [preprocess, extract, represent]
+
+    def _fitted_state(self):
+        return {name: value for name, value in vars(self).items()
+                if name.endswith('_') and name != 'ranking_'}
+
+    # 1.Preprocessing ----------------------------------------------------------------------------------------------->
+
+    def _preprocess(self, df, fit=False):
+        df = df.copy()
+        df['gender'] = df['gender'].replace('None', np.nan)
+        if fit:
+            self.distributions_ = fit_distributions(df, IMPUTED_COLUMNS)
+        keys = row_keys(df['textID'] if 'textID' in df.columns else df.index.to_series())
+
+        # Fill missing values for 'email' with 'unknown'
+        df['email'] = df['email'].fillna('unknown')
+
+        # Fill missing values for 'embedded_content', 'platform' and 'gender' based on their probability distributions
+        for column in IMPUTED_COLUMNS:
+            uniforms = row_uniforms(self.random_state, f'impute_{column}', keys)
+            df[column] = fill_from_distribution(df[column], self.distributions_[column], uniforms)
+
+        # Fill missing values for 'email_verified' and 'blue_tick' with each other, or randomly if both are missing
+        df['email_verified'], df['blue_tick'] = cross_fill(
+            df['email_verified'], df['blue_tick'], row_uniforms(self.random_state, 'impute_email_verified', keys),
+            row_uniforms(self.random_state, 'impute_blue_tick', keys))
+
+        # Convert 'message_date' to categorical and create 'message_time_category' column
+        df['message_date'] = pd.to_datetime(df['message_date'])
+        df['message_time_category'] = df['message_date'].dt.hour.apply(categorize_hour)
+
+        # Clean the text and remove top 0.05% of most common or not common words of the training corpus
+        token_lists, frequency_index = tokenize_and_count(df['text'], self.stemmer, self.n_jobs, self.chunk_size)
+        if fit:
+            self.frequency_index_ = frequency_index
+            self.stop_words_ = self.frequency_index_.stop_words(self.h_pct, self.l_pct)
+        df['clean_text'] = clean_token_lists(token_lists, self.stop_words_)
+
+        return df
+
+    # 2.Feature Extraction ------------------------------------------------------------------------------------------>
+
+    def _extract_features(self, df, dates, fit=False):
+        # 1. Length of messages, number of messages sent, followers and following
+        # The date list columns are stored as offsets + values, so the counts are the differences of the offsets
+        df['message_length'] = df['text'].str.len()
+        df['num_messages_sent'] = dates['previous_messages_dates'].counts()
+        df['follower_count'] = dates['date_of_new_follower'].counts()
+        df['following_count'] = dates['date_of_new_follow'].counts()
+
+        # 2. N-GRAM, fitted and transformed in one pass over the training text
+        # In hashing mode there is nothing to fit, the text is hashed in blocks of rows. The fit keeps how the n-grams
+        # of the training text collide in collision_report_
+        if self.ngram_mode == 'hashing':
+            self.vectorizer_ = make_hashing_vectorizer(self.n_hashed_features)
+            if fit:
+                self.collision_report_ = hashing_collision_report(df['clean_text'], self.n_hashed_features)
+            ngrams = hash_in_chunks(self.vectorizer_, df['clean_text'], self.n_jobs, self.chunk_size)
+        elif fit:
+            vectorizer = CountVectorizer(ngram_range=(1, 2), max_features=self.max_features)
+            if self.vectorizer_cache is not None:
+                self.vectorizer_, ngrams = self.vectorizer_cache.fit_transform(vectorizer, df['clean_text'])
+            else:
+                self.vectorizer_, ngrams = vectorizer, vectorizer.fit_transform(df['clean_text'])
+        else:
+            ngrams = self.vectorizer_.transform(df['clean_text'])
+
+        # 3. Email domain endings
+        df['email_domain_ending'] = df['email'].apply(extract_email_domain_ending)
+
+        # 4. Seniority in years
+        df['account_creation_date'] = pd.to_datetime(df['account_creation_date'])
+        df['seniority'] = (datetime.now() - df['account_creation_date']).dt.days / 365.25
+
+        # 5. Average time difference between messages, and the optional timing statistics
+        time_stats = time_difference_statistics(dates['previous_messages_dates'], ['mean'] + self.time_statistics)
+        df['average_time_difference'] = np.trunc(time_stats['mean'])
+        for statistic in self.time_statistics:
+            df[f'time_difference_{statistic}'] = time_stats[statistic]
+
+        return df, ngrams
+
+    # 3.Feature Representation -------------------------------------------------------------------------------------->
+
+    def _represent(self, df, ngrams, fit=False):
+        if fit:
+            self.max_values_ = {column: df[column].max() for column in COLUMNS_TO_NORMALIZE + self._time_columns()}
+            self.categories_ = {column: sorted(df[column].dropna().unique()) for column in ONEHOT_PREFIXES}
+            self.scaler_ = MaxAbsScaler().fit(ngrams)
+            schema = self._tabular_schema()
+            self.feature_names_ = [name for name, _ in schema] + self._ngram_feature_names()
+            # 'binary' for the 0/1 columns (binary mappings and one-hot), 'continuous' for the normalized ones
+            self.feature_kinds_ = [kind for _, kind in schema]
+            self.feature_kinds_ += ['continuous'] * (len(self.feature_names_) - len(schema))
+
+        # The columns of the tabular features are known from the fitted state, so the block is allocated once and
+        # every group of features writes into its own columns
+        dtype = np.float32 if self.compact_dtypes else np.float64
+        tabular = np.zeros((len(df), len(self._tabular_schema())), dtype=dtype)
+        position = 0
+
+        # Convert gender, email_verified and blue_tick to binary values
+        for column, mapping in BINARY_MAPPINGS.items():
+            tabular[:, position] = df[column].map(mapping).to_numpy(dtype=float)
+            position += 1
+
+        # Normalize the values by dividing each column by its maximum value of the training data
+        for column in COLUMNS_TO_NORMALIZE:
+            tabular[:, position] = df[column].to_numpy(dtype=float) / self.max_values_[column]
+            position += 1
+
+        # Timing features are normalized the same way, burstiness is moved from [-1, 1] to [0, 1] for chi2
+        # Users with less than 2 previous messages get 0
+        for column in self._time_columns():
+            values = df[column].to_numpy(dtype=float)
+            if column == 'time_difference_burstiness':
+                values = (values + 1) / 2
+            else:
+                values = values / self.max_values_[column]
+            tabular[:, position] = np.where(np.isnan(values), 0, values)
+            position += 1
+
+        # One-hot coding over the training categories, unseen categories are all zeros
+        for column in ONEHOT_PREFIXES:
+            codes = pd.Categorical(df[column], categories=self.categories_[column]).codes
+            rows = np.flatnonzero(codes >= 0)
+            tabular[rows, position + codes[rows]] = 1
+            position += len(self.categories_[column])
+
+        # Normalization for the n-gram features, the counts are non-negative so max-abs scaling keeps them in [0, 1]
+        # like min-max scaling, without densifying the matrix. The tabular block is stacked next to them
+        return sparse.hstack([sparse.csr_matrix(tabular), self.scaler_.transform(ngrams)], format='csr', dtype=dtype)
+
+    def _tabular_schema(self):
+        # (name, kind) of every tabular feature in column order, the one-hot columns are named like pd.get_dummies
+        schema = [(column, 'binary') for column in BINARY_MAPPINGS]
+        schema += [(f'normalized_{column}', 'continuous') for column in COLUMNS_TO_NORMALIZE + self._time_columns()]
+        for column, prefix in ONEHOT_PREFIXES.items():
+            schema += [(f'{prefix}_{category}', 'binary') for category in self.categories_[column]]
+        return schema
+
+    def _ngram_feature_names(self):
+        if self.ngram_mode == 'hashing':
+            return hashed_feature_names(self.n_hashed_features)
+        return list(self.vectorizer_.get_feature_names_out())
+
+    def _time_columns(self):
+        return [f'time_difference_{statistic}' for statistic in self.time_statistics]
+
+    # 4.Feature Selection ------------------------------------------------------------------------------------------->
+
+    def set_k(self, k):
+        # Changing k only takes the first k features of the cached ranking, nothing is refitted
+        self.k = k
+        self.selected_indices_ = self.ranking_.top_k(k)
+        self.selected_columns_ = [self.feature_names_[i] for i in self.selected_indices_]
+
+    def select(self, X, index=None):
+        # Only the k selected columns are densified, unless the model takes the sparse matrix directly
+        X = X[:, self.selected_indices_]
+        if self.sparse_output:
+            return X
+        if not self.compact_dtypes:
+            return pd.DataFrame(X.toarray(), columns=self.selected_columns_, index=index)
+        X = X.toarray()
+        return pd.DataFrame({column: X[:, j].astype(self.feature_dtype(i))
+                             for j, (i, column) in enumerate(zip(self.selected_indices_, self.selected_columns_))},
+                            index=index)
+
+    def feature_dtype(self, i):
+        # dtype of feature i in the selected DataFrame
+        if not self.compact_dtypes:
+            return np.float64
+        return np.uint8 if self.feature_kinds_[i] == 'binary' else np.float32
+
+    # Persistence --------------------------------------------------------------------------------------------------->
+
+    def save(self, path, model=None):
+        with open(path, 'wb') as f:
+            pickle.dump({'pipeline': self, 'model': model}, f)
+
+    @staticmethod
+    def load(path):
+        with open(path, 'rb') as f:
+            artifact = pickle.load(f)
+        return artifact['pipeline'], artifact['model']
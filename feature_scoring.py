@@ -0,0 +1,97 @@
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.base import clone
+from sklearn.feature_selection import chi2
+from sklearn.metrics import roc_auc_score
+
+
+def class_moments(X, y):
+    # Per-class count, mean and sample variance of every column in one pass, with a class indicator matrix
+    # instead of boolean-masked copies of the class subsets
+    classes, labels = np.unique(np.asarray(y), return_inverse=True)
+    indicator = sparse.csr_matrix((np.ones(len(labels)), (labels, np.arange(len(labels)))),
+                                  shape=(len(classes), len(labels)))
+    counts = np.asarray(indicator.sum(axis=1)).reshape(-1, 1)
+
+    if sparse.issparse(X):
+        X = sparse.csr_matrix(X, dtype=float)
+        sums = np.asarray((indicator @ X).todense())
+        sums_of_squares = np.asarray((indicator @ X.multiply(X)).todense())
+    else:
+        X = np.asarray(X, dtype=float)
+        sums = indicator @ X
+        sums_of_squares = indicator @ (X ** 2)
+
+    means = sums / counts
+    variances = (sums_of_squares - counts * means ** 2) / (counts - 1)
+    return classes, means, variances
+
+
+def fisher_score_func(X, y):
+    # (mean_1 - mean_2)^2 / (var_1 + var_2) of the two classes, usable as a SelectKBest score function
+    classes, means, variances = class_moments(X, y)
+    if len(classes) != 2:
+        raise ValueError(f'Fisher score needs exactly 2 classes, got {len(classes)}')
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (means[0] - means[1]) ** 2 / (variances[0] + variances[1])
+
+
+def fisher_scores(X, y, feature_names=None):
+    # Fisher score of every feature, sorted from the highest to the lowest
+    if feature_names is None:
+        feature_names = X.columns if isinstance(X, pd.DataFrame) else range(X.shape[1])
+    scores = pd.DataFrame({'Fisher Score': fisher_score_func(X, y)}, index=feature_names)
+    return scores.sort_values(by='Fisher Score', ascending=False)
+
+
+def take_columns(X, columns):
+    if isinstance(X, pd.DataFrame):
+        return X.iloc[:, columns]
+    return X[:, columns]
+
+
+class FeatureRanking:
+    # Scores every feature once and keeps the ranked order, so the k best features for any k are the first k
+    def __init__(self, X, y, feature_names=None, score_func='chi2'):
+        if score_func == 'chi2':
+            self.scores = chi2(X, y)[0]
+        elif score_func == 'fisher':
+            self.scores = fisher_score_func(X, y)
+        else:
+            raise ValueError(f"score_func must be 'chi2' or 'fisher', got '{score_func}'")
+        self.score_func = score_func
+        if feature_names is None:
+            feature_names = X.columns if isinstance(X, pd.DataFrame) else range(X.shape[1])
+        self.feature_names = list(feature_names)
+
+        # Same order as SelectKBest: NaN scores last, ties broken towards the later columns
+        scores = np.where(np.isnan(self.scores), -np.inf, self.scores)
+        self.order = np.argsort(scores, kind='mergesort')[::-1]
+
+    def top_k(self, k):
+        # Indices of the k best features, in column order
+        return np.sort(self.order[:k])
+
+    def columns(self, k):
+        return [self.feature_names[i] for i in self.top_k(k)]
+
+    def select(self, X, k):
+        return take_columns(X, self.top_k(k))
+
+    def table(self):
+        return pd.DataFrame({'Score': self.scores[self.order]}, index=[self.feature_names[i] for i in self.order])
+
+    def sweep(self, model, X_train, y_train, X_val, y_val, ks):
+        # Validation AUC-ROC of the model trained on the k best features, for every k, on the same matrices
+        results = []
+        for k in ks:
+            columns = self.top_k(k)
+            start = time.perf_counter()
+            fitted = clone(model).fit(take_columns(X_train, columns), y_train)
+            fit_time = time.perf_counter() - start
+            y_val_pred_proba = fitted.predict_proba(take_columns(X_val, columns))[:, 1]
+            results.append({'k': k, 'fit_time': fit_time, 'AUC-ROC': roc_auc_score(y_val, y_val_pred_proba)})
+        return pd.DataFrame(results)
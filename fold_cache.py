@@ -0,0 +1,119 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.model_selection import StratifiedKFold
+
+from artifact_cache import content_digest
+
+
+class FoldCache:
+    # The training matrix converted once into a contiguous read-only float array, with the fold indices of the
+    # cross validation computed once, so every search and loop over the training data shares the same arrays
+    # The folds are the ones GridSearchCV(cv=5) uses for a classifier, StratifiedKFold without shuffling
+    def __init__(self, X, y, cv=5, dtype=np.float64):
+        self.feature_names = list(X.columns) if hasattr(X, 'columns') else None
+        self.dtype = dtype
+        # The cache freezes its own copies, the caller's X and y stay writeable
+        if sparse.issparse(X):
+            self.X = sparse.csr_matrix(X, dtype=dtype, copy=True)
+        else:
+            self.X = np.array(X, dtype=dtype, order='C')
+        self.y = np.array(y)
+        if self.y.dtype == object:
+            # Fixed width labels, so they can be memory mapped with the matrix
+            self.y = self.y.astype(str)
+        self.shape = self.X.shape
+        self.sparse = sparse.issparse(self.X)
+        self.n_splits = cv
+        self.shared_dir = None
+        self.splits = list(StratifiedKFold(n_splits=cv).split(self.X, self.y))
+        for array in [self.X, self.y]:
+            if not sparse.issparse(array):
+                array.flags.writeable = False
+
+        # Hash of the data and the folds, trials of other data or folds never share a checkpoint
+        if self.sparse:
+            arrays = [self.X.data, self.X.indices, self.X.indptr]
+        else:
+            arrays = [self.X]
+        arrays += [np.asarray(self.X.shape)] + [test for _, test in self.splits]
+        self.digest = content_digest(pd.DataFrame({'y': self.y}), arrays)
+
+    def share(self, directory=None):
+        # Move the training matrix and the fold indices into memory mapped .npy files (in RAM under /dev/shm when
+        # there is one). A pickled FoldCache, like the one sent to every worker process, then only carries the file
+        # paths and each worker maps the same pages read-only, so the memory stays close to one copy whatever the
+        # number of workers
+        if directory is None and os.path.isdir('/dev/shm'):
+            directory = '/dev/shm'
+        self.shared_dir = tempfile.mkdtemp(prefix='fold_cache_', dir=directory)
+        # /dev/shm is RAM until reboot, the files are also removed when the script exits with an exception or an
+        # interrupt before close() is called
+        atexit.register(self.close)
+        if self.sparse:
+            arrays = {'data': self.X.data, 'indices': self.X.indices, 'indptr': self.X.indptr, 'y': self.y}
+        else:
+            arrays = {'X': self.X, 'y': self.y}
+        for i, (train, test) in enumerate(self.splits):
+            arrays[f'train_{i}'] = train
+            arrays[f'test_{i}'] = test
+        for name, array in arrays.items():
+            np.save(os.path.join(self.shared_dir, f'{name}.npy'), array)
+        self.load_shared()
+        return self
+
+    def load_shared(self):
+        def load(name):
+            return np.load(os.path.join(self.shared_dir, f'{name}.npy'), mmap_mode='r')
+
+        if self.sparse:
+            # Set the arrays directly, the csr_matrix constructor would copy them
+            self.X = sparse.csr_matrix(self.shape, dtype=self.dtype)
+            self.X.data, self.X.indices, self.X.indptr = load('data'), load('indices'), load('indptr')
+        else:
+            self.X = load('X')
+        self.y = load('y')
+        self.splits = [(load(f'train_{i}'), load(f'test_{i}')) for i in range(self.n_splits)]
+
+    def close(self):
+        # The files are removed, the processes that still map them keep their pages until they unmap them
+        # The cache is not used after close, so the matrix, labels and folds are dropped instead of copied back to
+        # the heap. The maps are released first, a mapped file cannot be removed on Windows
+        if self.shared_dir is not None:
+            self.X = self.y = self.splits = None
+            shutil.rmtree(self.shared_dir, ignore_errors=True)
+            self.shared_dir = None
+            atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self.shared_dir is not None:
+            del state['X'], state['y'], state['splits']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.shared_dir is not None:
+            self.load_shared()
+
+    def as_array(self, X):
+        # Other data (the validation set) in the same representation as the training matrix
+        if sparse.issparse(X):
+            return sparse.csr_matrix(X, dtype=self.dtype)
+        return np.ascontiguousarray(X, dtype=self.dtype)
+
+    def nbytes(self):
+        if self.sparse:
+            return self.X.data.nbytes + self.X.indices.nbytes + self.X.indptr.nbytes
+        return self.X.nbytes
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+
+def fit_distributions(df, columns):
+    # Probability distribution of the values of every column, to draw the missing values from
+    return {column: df[column].value_counts(normalize=True) for column in columns}
+
+
+def fill_from_distribution(values, prob_dist, uniforms):
+    # Fill the missing values with draws from the distribution, by inverting its cumulative sum at the uniform
+    # value of every row, all the draws of the column in one batch
+    missing = values.isnull().to_numpy()
+    if not missing.any():
+        return values
+    filled = values.to_numpy(dtype=object, copy=True)
+    cumulative = np.cumsum(prob_dist.to_numpy())
+    choices = np.searchsorted(cumulative, uniforms[missing] * cumulative[-1], side='right')
+    filled[missing] = prob_dist.index.to_numpy(dtype=object)[np.minimum(choices, len(cumulative) - 1)]
+    return pd.Series(filled, index=values.index, name=values.name)
+
+
+def cross_fill(first, second, first_uniforms, second_uniforms):
+    # If one attribute is missing, fill it with the value of the other attribute
+    # If both attributes are missing, fill both randomly with True or False
+    first_values = first.to_numpy(dtype=object)
+    second_values = second.to_numpy(dtype=object)
+    first_missing = pd.isnull(first_values)
+    second_missing = pd.isnull(second_values)
+    both_missing = first_missing & second_missing
+
+    first_filled = np.where(first_missing, second_values, first_values)
+    second_filled = np.where(second_missing, first_values, second_values)
+    first_filled[both_missing] = first_uniforms[both_missing] < 0.5
+    second_filled[both_missing] = second_uniforms[both_missing] < 0.5
+
+    return (pd.Series(first_filled.astype(bool), index=first.index, name=first.name),
+            pd.Series(second_filled.astype(bool), index=second.index, name=second.name))
@@ -0,0 +1,167 @@
+import numbers
+import os
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import HalvingRandomSearchCV, ParameterGrid, cross_validate
+
+from artifact_cache import ArtifactCache
+from parallel import map_chunks
+
+
+def halving_random_search(estimator, param_distributions, X, y, n_candidates=100, factor=3, cv=5,
+                          scoring='roc_auc', random_state=42, n_jobs=-1):
+    # Successive halving: every candidate starts on a small sample of the rows, and only the best 1/factor of the
+    # candidates of each round go on with factor times more rows. Candidates and folds run on all the cores
+    search = HalvingRandomSearchCV(estimator, param_distributions, n_candidates=n_candidates, factor=factor, cv=cv,
+                                   scoring=scoring, random_state=random_state, n_jobs=n_jobs)
+    search.fit(X, y)
+    return search
+
+
+def candidate_times(search):
+    # Fit and score time spent on every candidate, summed over all its rounds and folds (compute time, not wall-clock
+    # time, the folds and candidates run in parallel), with the last round it reached
+    # Random draws can repeat a parameter setting, so candidates are told apart by their params dict: the search
+    # carries the same dict object into the next rounds
+    results = pd.DataFrame(search.cv_results_)
+    results['candidate'] = [id(params) for params in search.cv_results_['params']]
+    results['params'] = results['params'].astype(str)
+    results['compute_time'] = (results['mean_fit_time'] + results['mean_score_time']) * search.n_splits_
+    results = results.sort_values('iter', kind='stable')
+    candidates = results.groupby('candidate', sort=False).agg(
+        params=('params', 'first'), rounds=('iter', 'size'), n_resources=('n_resources', 'last'),
+        mean_test_score=('mean_test_score', 'last'), compute_time=('compute_time', 'sum'))
+    return candidates.set_index('params').sort_values('mean_test_score', ascending=False)
+
+
+def run_trial(task):
+    # Cross validated AUC-ROC of one parameter setting, the result is checkpointed before it is returned
+    estimator, params, folds, path = task
+    scores = cross_validate(clone(estimator).set_params(**params), folds.X, folds.y, cv=folds.splits,
+                            scoring='roc_auc', return_train_score=True)
+    result = dict(params, fit_time=scores['fit_time'].mean(), train_auc=scores['train_score'].mean(),
+                  val_auc=scores['test_score'].mean())
+
+    # Write to a temporary file first, so an interrupted trial never leaves a half written checkpoint
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(result, f)
+    os.replace(tmp_path, path)
+    return result
+
+
+class ExperimentRunner:
+    # Runs every trial of a declarative search space (a dict or a list of dicts of parameter lists, like the
+    # param_grid of GridSearchCV) in a process pool, over the folds of a FoldCache. Every finished trial is saved on
+    # disk under a key of the estimator, the trial parameters and the folds, so an interrupted sweep resumes where
+    # it stopped
+    def __init__(self, estimator, directory='experiments', n_jobs=1):
+        self.estimator = estimator
+        self.directory = directory
+        self.n_jobs = n_jobs
+        self.resumed = 0
+        self.ran = 0
+
+    def trial_path(self, params, folds):
+        key = ArtifactCache.key(type(self.estimator).__name__, sorted(self.estimator.get_params().items()),
+                                sorted(params.items()), folds.digest)
+        return os.path.join(self.directory, f'{key}.pkl')
+
+    def run(self, space, folds):
+        os.makedirs(self.directory, exist_ok=True)
+        trials = list(ParameterGrid(space))
+        paths = [self.trial_path(params, folds) for params in trials]
+
+        results = {}
+        for i, path in enumerate(paths):
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    results[i] = pickle.load(f)
+        pending = [i for i in range(len(trials)) if i not in results]
+        self.resumed += len(results)
+        self.ran += len(pending)
+
+        tasks = [(self.estimator, trials[i], folds, paths[i]) for i in pending]
+        results.update(zip(pending, map_chunks(run_trial, tasks, self.n_jobs)))
+        # One table of all the trials in the order of the search space
+        return pd.DataFrame([results[i] for i in range(len(trials))])
+
+    def cache_info(self):
+        return {'resumed': self.resumed, 'ran': self.ran}
+
+
+def epoch_curve(estimator, X_train, y_train, X_val, y_val, checkpoints, patience=None, tol=1e-4):
+    # One model trained epoch by epoch with partial_fit and scored at every checkpoint epoch, the whole curve costs
+    # one fit of the last checkpoint instead of a fit per max_iter. With patience, training stops after that many
+    # checkpoints without a validation AUC-ROC gain of more than tol
+    # Like fit, training also stops once the training loss did not improve by more than the tol of the estimator for
+    # more than n_iter_no_change epochs, and the next checkpoints keep the converged model (n_iter is the number of
+    # epochs trained). A row is close to, but not exactly, the model of fit(max_iter=epoch): fit shuffles the order
+    # of the previous epoch while every partial_fit shuffles the original order, so the minibatches differ from the
+    # second epoch on. Also not reproduced: the 'adaptive' learning rate of sgd (fit lowers the rate instead of
+    # stopping) and early_stopping=True, which partial_fit does not support
+    model = clone(estimator)
+    # partial_fit calls check_random_state(random_state) on every call, with an int seed every epoch would replay
+    # the same minibatch shuffle. A RandomState of the seed advances from epoch to epoch like within one fit
+    random_state = model.get_params()['random_state']
+    if random_state is None or isinstance(random_state, numbers.Integral):
+        model.set_params(random_state=np.random.RandomState(random_state))
+
+    classes = np.unique(y_train)
+    rows = []
+    epoch = 0
+    fit_time = 0.0
+    best_loss = np.inf
+    no_improvement = 0
+    best_auc = -np.inf
+    stale = 0
+    for checkpoint in sorted(checkpoints):
+        start = time.perf_counter()
+        while epoch < checkpoint and no_improvement <= model.n_iter_no_change:
+            model.partial_fit(X_train, y_train, classes=classes)
+            epoch += 1
+            no_improvement = no_improvement + 1 if model.loss_ > best_loss - model.tol else 0
+            best_loss = min(best_loss, model.loss_)
+        fit_time += time.perf_counter() - start
+
+        val_auc = roc_auc_score(y_val, model.predict_proba(X_val)[:, 1])
+        rows.append({'epoch': checkpoint, 'n_iter': epoch, 'fit_time': fit_time,
+                     'train_auc': roc_auc_score(y_train, model.predict_proba(X_train)[:, 1]), 'val_auc': val_auc})
+        if val_auc > best_auc + tol:
+            best_auc = val_auc
+            stale = 0
+        else:
+            stale += 1
+        if patience is not None and stale >= patience:
+            break
+    return model, pd.DataFrame(rows)
+
+
+def fit_and_score(task):
+    # Fit one parameter setting and score its decision values on the validation data, the model is returned with
+    # the scores so the caller keeps it instead of refitting
+    estimator, params, folds, X_val, y_val = task
+    model = clone(estimator).set_params(**params)
+    start = time.perf_counter()
+    model.fit(folds.X, folds.y)
+    fit_time = time.perf_counter() - start
+    return model, fit_time, roc_auc_score(y_val, model.decision_function(X_val))
+
+
+def regularization_path(estimator, folds, X_val, y_val, C_values, n_jobs=-1):
+    # One model per C, fitted in parallel on the whole training matrix of a FoldCache, with its AUC-ROC on the
+    # validation data
+    # liblinear (LinearSVC) cannot be warm started, so the fits are independent and a dense grid of C runs on
+    # all the cores instead
+    tasks = [(estimator, {'C': C}, folds, X_val, y_val) for C in C_values]
+    fits = map_chunks(fit_and_score, tasks, n_jobs)
+    models = [model for model, _, _ in fits]
+    path = pd.DataFrame({'C': C_values, 'fit_time': [fit_time for _, fit_time, _ in fits],
+                         'AUC-ROC': [auc for _, _, auc in fits]})
+    return models, path
@@ -0,0 +1,43 @@
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.feature_extraction.text import HashingVectorizer
+
+from parallel import chunk_slices, map_chunks
+
+
+def make_hashing_vectorizer(n_features=2 ** 12):
+    # Unigram + bigram counts hashed into a fixed number of columns, no vocabulary to fit or carry around
+    return HashingVectorizer(ngram_range=(1, 2), n_features=n_features, alternate_sign=False, norm=None)
+
+
+def hashed_feature_names(n_features):
+    return [f'ngram_hash_{i}' for i in range(n_features)]
+
+
+def hash_in_chunks(vectorizer, texts, n_jobs=1, chunk_size=10000):
+    # The vectorizer is stateless, so blocks of rows can be hashed in separate processes and stacked in order
+    texts = list(texts)
+    chunks = [texts[rows] for rows in chunk_slices(len(texts), chunk_size)]
+    if not chunks:
+        return vectorizer.transform([])
+    return sparse.vstack(map_chunks(vectorizer.transform, chunks, n_jobs), format='csr')
+
+
+def hashing_collision_report(texts, n_features=2 ** 12):
+    # How the distinct n-grams of the corpus fall into the hashed columns. colliding_ngrams counts the n-grams whose
+    # column also holds another n-gram (colliding_rate is their share), collision_rate is the share of n-grams lost
+    # to merging, 1 - used_columns / n_ngrams
+    analyzer = make_hashing_vectorizer(n_features).build_analyzer()
+    ngrams = sorted({ngram for text in texts for ngram in analyzer(text)})
+    hasher = FeatureHasher(n_features=n_features, input_type='string', alternate_sign=False)
+    columns = hasher.transform([[ngram] for ngram in ngrams]).indices
+    ngrams_per_column = np.bincount(columns, minlength=n_features)
+    used_columns = int(np.count_nonzero(ngrams_per_column))
+    colliding_ngrams = int(ngrams_per_column[ngrams_per_column > 1].sum())
+    return {'n_features': n_features,
+            'n_ngrams': len(ngrams),
+            'used_columns': used_columns,
+            'colliding_ngrams': colliding_ngrams,
+            'colliding_rate': colliding_ngrams / len(ngrams) if ngrams else 0.0,
+            'collision_rate': 1 - used_columns / len(ngrams) if ngrams else 0.0}
@@ -0,0 +1,28 @@
+import os
+
+from joblib import Parallel, delayed
+
+
+def resolve_n_jobs(n_jobs):
+    # Same convention as sklearn: None is 1 worker, -1 is all the cores, -2 all the cores but one
+    if n_jobs is None:
+        return 1
+    if n_jobs < 0:
+        return max(os.cpu_count() + 1 + n_jobs, 1)
+    return n_jobs
+
+
+def chunk_slices(n_rows, chunk_size):
+    return [slice(start, min(start + chunk_size, n_rows)) for start in range(0, n_rows, chunk_size)]
+
+
+def map_chunks(func, chunks, n_jobs=1):
+    # Results are returned in chunk order, so the output does not depend on how the workers are scheduled
+    # func and the chunks have to be picklable when n_jobs > 1
+    # The workers are joblib (loky) processes like the ones of sklearn's n_jobs. They do not re-run the calling
+    # script, so scripts without an `if __name__ == '__main__':` guard also work where processes are spawned
+    n_jobs = resolve_n_jobs(n_jobs)
+    if n_jobs == 1 or len(chunks) <= 1:
+        return [func(chunk) for chunk in chunks]
+    return Parallel(n_jobs=min(n_jobs, len(chunks)), backend='loky')(delayed(func)(chunk) for chunk in chunks)
+
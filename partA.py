@@ -8,8 +8,12 @@ import numpy as np
 from sklearn.feature_extraction.text import CountVectorizer
 from datetime import datetime
 from sklearn.preprocessing import MinMaxScaler
+from feature_scoring import fisher_scores
+from data_access import load_dataset
+from feature_pipeline import INPUT_COLUMNS
+from time_features import as_ragged_dates, time_difference_statistics
 
-df = pd.read_pickle(r'/Users/maya/Documents/Information Systems/שנה ג׳/למידת מכונה/פרוייקט קורס/XY_train.pkl')
+df = load_dataset('train', columns=INPUT_COLUMNS + ['sentiment'])
 df.head()
 # %% md
 ## EDA Code
@@ -97,9 +101,11 @@ lower = df['text'].apply(str.lower)
 
 # stemming
 from nltk.stem import SnowballStemmer
+from stemming import CachedStemmer
 
-stem = SnowballStemmer('english')
+stem = CachedStemmer.load('stem_cache.pkl', SnowballStemmer('english'))
 stemmed = lower.apply(lambda x: ' '.join(stem.stem(word) for word in str(x).split()))
+stem.save('stem_cache.pkl')
 
 # remove punctuation
 import re
@@ -152,11 +158,12 @@ print(missing_values_table)
 df['message_length'] = df['text'].apply(lambda x: len(x))
 
 # 2. create the number of messages sent by the user
-df['num_messages_sent'] = df['previous_messages_dates'].apply(len)
+# The date lists are arrow lists in the parquet data, their lengths are the differences of the offsets
+df['num_messages_sent'] = as_ragged_dates(df['previous_messages_dates']).counts()
 
 # 3. create num of followers and following
-df['follower_count'] = df['date_of_new_follower'].apply(lambda x: len(x))
-df['following_count'] = df['date_of_new_follow'].apply(lambda x: len(x))
+df['follower_count'] = as_ragged_dates(df['date_of_new_follower']).counts()
+df['following_count'] = as_ragged_dates(df['date_of_new_follow']).counts()
 
 # 4. append new columns created to the df
 new_columns_df = df[['follower_count', 'following_count']]
@@ -200,23 +207,9 @@ df['seniority'] = (current_date - df['account_creation_date']).dt.days / 365.25
 
 
 # 8. create the average time difference between messages
-def calculate_average_time_difference(message_dates_array):
-    message_dates = [datetime.strptime(date_str, '%Y-%m-%d %H:%M:%S') for date_str in message_dates_array]
-    time_diffs = []
-    for i in range(1, len(message_dates)):
-        time_diff = (message_dates[i] - message_dates[i - 1]).total_seconds()
-        if time_diff < 0:
-            time_diff = (message_dates[i - 1] - message_dates[i]).total_seconds()
-        time_diffs.append(time_diff)
-    if len(time_diffs) > 0:
-        average_time_difference = sum(time_diffs) / len(time_diffs)
-        average_time_difference = int(average_time_difference)
-        return average_time_difference
-    else:
-        return None
-
-
-df['average_time_difference'] = df['previous_messages_dates'].apply(calculate_average_time_difference)
+# The date lists are arrow lists of timestamps in the parquet data, the mean is truncated to whole seconds like int()
+time_stats = time_difference_statistics(df['previous_messages_dates'])
+df['average_time_difference'] = np.trunc(time_stats['mean'])
 # %% md
 ### 4. Feature Representation
 # %%
@@ -273,37 +266,12 @@ df.head()
 # nan_rows
 
 # %%
-# Separate the dataset into positive and negative sentiment groups
-positive_sentiment = df[df['sentiment'] == 1]
-negative_sentiment = df[df['sentiment'] == -1]
-
+# Calculate Fisher score for each feature in one pass over the feature matrix
 # Remove 'sentiment', 'textID' columns as we are not considering it as a feature
-features = df.drop(columns=['sentiment', 'textID']).columns
-
-# print(features)
-
-fisher_scores = {}
-
-# Calculate Fisher score for each feature
-for feature in features:
-    mean_positive = positive_sentiment[feature].mean()
-    mean_negative = negative_sentiment[feature].mean()
-    var_positive = positive_sentiment[feature].var()
-    var_negative = negative_sentiment[feature].var()
-
-    # print(var_negative)
-    # print(var_positive)
-
-    fisher_score = ((mean_positive - mean_negative) ** 2) / (var_positive + var_negative)
-    # print(feature)
-    fisher_scores[feature] = round(fisher_score, 3)  # Round to 3 decimal places
-
-# print(fisher_scores)
-
-fisher_df = pd.DataFrame.from_dict(fisher_scores, orient='index', columns=['Fisher Score'])
+fisher_df = fisher_scores(df.drop(columns=['sentiment', 'textID']), df['sentiment'])
 
-# sort the features by highest to lowest
-fisher_df = fisher_df.sort_values(by='Fisher Score', ascending=False)
+# Round to 3 decimal places, the features are sorted by highest to lowest
+fisher_df = fisher_df.round(3)
 
 pd.set_option('display.max_rows', None)
 pd.set_option('display.max_columns', None)
@@ -0,0 +1,32 @@
+import zlib
+
+import numpy as np
+import pandas as pd
+
+
+def new_seed():
+    # A fresh 128-bit seed, saved with the pipeline so the same fitted pipeline always draws the same values
+    return np.random.SeedSequence().entropy
+
+
+def stage_key(stage):
+    return zlib.crc32(stage.encode())
+
+
+def row_keys(values):
+    # A 64-bit key of the content of every row, so a row gets the same draws whatever the run, batch or worker
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+def row_uniforms(seed, stage, keys):
+    # One uniform value in [0, 1) per row, from the key of the row mixed (splitmix64) with a child seed of the
+    # pipeline seed for the stage. Adding or removing draws in one stage does not change the values of the others,
+    # and the value of a row does not depend on the other rows
+    salt = np.random.SeedSequence(seed, spawn_key=(stage_key(stage),)).generate_state(1, dtype=np.uint64)[0]
+    x = np.asarray(keys, dtype=np.uint64) ^ salt
+    with np.errstate(over='ignore'):
+        x = x + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        x = x ^ (x >> np.uint64(31))
+    return (x >> np.uint64(11)).astype(np.float64) * 2.0 ** -53
@@ -0,0 +1,67 @@
+import os
+import pickle
+from collections import OrderedDict
+
+from nltk import SnowballStemmer
+
+
+class CachedStemmer:
+    # Memoizes word -> stem in a bounded LRU cache, so repeated words are stemmed only once
+    def __init__(self, stemmer=None, maxsize=100000):
+        self.stemmer = stemmer if stemmer is not None else SnowballStemmer('english')
+        self.maxsize = maxsize
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def stem(self, word):
+        stem = self.cache.get(word)
+        if stem is not None:
+            self.hits += 1
+            self.cache.move_to_end(word)
+            return stem
+
+        self.misses += 1
+        stem = self.stemmer.stem(word)
+        self.cache[word] = stem
+        # Evict the least recently used words once the cache is full
+        if self.maxsize is not None and len(self.cache) > self.maxsize:
+            self.cache.popitem(last=False)
+        return stem
+
+    def merge(self, other):
+        # Add the words stemmed by another CachedStemmer, like the one of a worker process, to this cache
+        # Its misses that this cache already knew are counted as hits
+        self.hits += other.hits
+        for word, stem in other.cache.items():
+            if word in self.cache:
+                self.hits += 1
+                self.cache.move_to_end(word)
+            else:
+                self.misses += 1
+                self.cache[word] = stem
+        while self.maxsize is not None and len(self.cache) > self.maxsize:
+            self.cache.popitem(last=False)
+
+    def cache_info(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.cache), 'maxsize': self.maxsize}
+
+    def clear(self):
+        self.cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def save(self, path):
+        # Only the word -> stem pairs are saved, in LRU order
+        with open(path, 'wb') as f:
+            pickle.dump(list(self.cache.items()), f)
+
+    @classmethod
+    def load(cls, path, stemmer=None, maxsize=100000):
+        cached_stemmer = cls(stemmer, maxsize)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                cached_stemmer.cache.update(pickle.load(f))
+            while maxsize is not None and len(cached_stemmer.cache) > maxsize:
+                cached_stemmer.cache.popitem(last=False)
+        return cached_stemmer
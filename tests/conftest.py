@@ -0,0 +1,42 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# The modules live in the repository root, next to the scripts
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def make_messages():
+    # Synthetic messages with the columns of the raw datasets and missing values in the imputed columns
+    def make(n_rows, seed=0, labels=True):
+        rng = np.random.default_rng(seed)
+        vocabulary = ['love', 'hate', 'great', 'bad', 'happy', 'sad', 'the', 'a', 'day', '!!', 'good', '123'] + \
+            [f'w{i}' for i in range(200)]
+        base = pd.Timestamp('2020-01-01')
+
+        def dates(count):
+            return [str(base + pd.Timedelta(seconds=int(s))) for s in rng.integers(0, 10 ** 8, count)]
+
+        rows = []
+        for i in range(n_rows):
+            sentiment = rng.choice(['positive', 'negative'])
+            words = list(rng.choice(vocabulary, rng.integers(1, 15))) + ['love' if sentiment == 'positive' else 'hate']
+            rows.append({
+                'textID': f't{seed}_{i}', 'text': ' '.join(words), 'sentiment': sentiment,
+                'gender': [None, 'None', 'M', 'F'][rng.integers(4)],
+                'email': [None, 'a@b.com', 'c@d.org', 'x@y.net'][rng.integers(4)],
+                'email_verified': [None, True, False][rng.integers(3)],
+                'blue_tick': [None, True, False][rng.integers(3)],
+                'embedded_content': [None, 'mp4', 'jpeg', 'link'][rng.integers(4)],
+                'platform': [None, 'instagram', 'telegram', 'facebook'][rng.integers(4)],
+                'previous_messages_dates': dates(rng.integers(0, 8)), 'date_of_new_follower': dates(rng.integers(0, 5)),
+                'date_of_new_follow': dates(rng.integers(0, 5)),
+                'account_creation_date': str(pd.Timestamp('2015-01-01') + pd.Timedelta(days=int(rng.integers(2000)))),
+                'message_date': dates(1)[0]})
+        df = pd.DataFrame(rows, index=range(100, 100 + n_rows))
+        return df if labels else df.drop(columns=['sentiment'])
+    return make
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+import data_access
+from batch_scoring import score_in_batches
+from feature_pipeline import INPUT_COLUMNS, FeaturePipeline, drop_incomplete_rows
+from time_features import DATE_LIST_COLUMNS
+
+
+class FirstFeature:
+    # Stands in for a model, the predictions are the first selected feature
+    def predict(self, X):
+        return X.iloc[:, 0].to_numpy()
+
+
+def test_parquet_round_trip(make_messages, tmp_path, monkeypatch):
+    train = make_messages(300)
+    test = make_messages(120, seed=1, labels=False)
+    # A missing list in every date list column
+    for column in DATE_LIST_COLUMNS:
+        test.loc[test.index[[3, 50]], column] = None
+    train.to_pickle(tmp_path / 'train.pkl')
+    test.to_pickle(tmp_path / 'test.pkl')
+    monkeypatch.setattr(data_access, 'DATA_DIR', str(tmp_path / 'data'))
+    monkeypatch.setattr(data_access, 'RAW_PICKLES', {'train': str(tmp_path / 'train.pkl'),
+                                                     'test': str(tmp_path / 'test.pkl')})
+
+    loaded = data_access.load_dataset('train', columns=INPUT_COLUMNS + ['sentiment'])
+    assert list(loaded.columns) == INPUT_COLUMNS + ['sentiment']
+    pd.testing.assert_index_equal(loaded.index, train.index)
+
+    pipeline = FeaturePipeline(random_state=1).fit(drop_incomplete_rows(loaded))
+    pipeline.set_k(len(pipeline.feature_names_))
+    from_pickle = FeaturePipeline(random_state=1).fit(drop_incomplete_rows(train))
+    from_pickle.set_k(len(from_pickle.feature_names_))
+
+    # The missing lists are empty, on the parquet and on the pickle path
+    expected = from_pickle.transform(test)
+    assert (expected.loc[test.index[[3, 50]], 'normalized_num_messages_sent'] == 0).all()
+    pd.testing.assert_frame_equal(pipeline.transform(data_access.load_dataset('test', columns=INPUT_COLUMNS)),
+                                  expected)
+
+    for path in [data_access.ensure_dataset('test'), str(tmp_path / 'test.pkl')]:
+        output_path = str(tmp_path / 'predictions.csv')
+        assert score_in_batches(pipeline, FirstFeature(), path, output_path, batch_size=50,
+                                columns=INPUT_COLUMNS) == len(test)
+        np.testing.assert_allclose(pd.read_csv(output_path)['y'], expected.iloc[:, 0])
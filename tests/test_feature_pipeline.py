@@ -0,0 +1,54 @@
+import pandas as pd
+
+from artifact_cache import ArtifactCache
+from feature_pipeline import FeaturePipeline, drop_incomplete_rows
+
+
+def test_transform_does_not_depend_on_the_batch(make_messages):
+    pipeline = FeaturePipeline(random_state=1).fit(drop_incomplete_rows(make_messages(400)))
+    # All the features, with the imputed ones
+    pipeline.set_k(len(pipeline.feature_names_))
+    test = make_messages(250, seed=1, labels=False)
+
+    whole = pipeline.transform(test)
+    for batch_size in [100, 70]:
+        batches = [pipeline.transform(test.iloc[start:start + batch_size])
+                   for start in range(0, len(test), batch_size)]
+        pd.testing.assert_frame_equal(pd.concat(batches), whole)
+
+
+def test_imputation_is_reproducible(make_messages):
+    train = drop_incomplete_rows(make_messages(300))
+    first, _ = FeaturePipeline(k=200, random_state=7).fit_transform(train)
+    second, _ = FeaturePipeline(k=200, random_state=7).fit_transform(train)
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_only_the_fit_is_cached(make_messages, tmp_path):
+    train = drop_incomplete_rows(make_messages(300))
+    test = make_messages(100, seed=1, labels=False)
+    cache = ArtifactCache(str(tmp_path))
+    pipeline = FeaturePipeline(k=15, random_state=1, artifact_cache=cache)
+    X, _ = pipeline.fit_transform(train)
+    assert cache.cache_info()['entries'] == 3
+
+    pipeline.transform(test)
+    pipeline.transform(test.iloc[:50])
+    assert cache.cache_info()['entries'] == 3
+
+    cached = FeaturePipeline(k=15, random_state=1, artifact_cache=cache)
+    X_cached, _ = cached.fit_transform(train)
+    assert cache.hits == 1
+    pd.testing.assert_frame_equal(X_cached, X)
+    pd.testing.assert_frame_equal(cached.transform(test), pipeline.transform(test))
+
+
+def test_hashing_fit_reports_the_collisions(make_messages):
+    pipeline = FeaturePipeline(k=15, random_state=1, ngram_mode='hashing', n_hashed_features=16)
+    pipeline.fit(drop_incomplete_rows(make_messages(300)))
+    report = pipeline.collision_report_
+    # Far more n-grams than columns, every column is shared
+    assert report['used_columns'] == 16
+    assert report['colliding_ngrams'] == report['n_ngrams']
+    assert report['colliding_rate'] == 1.0
+    assert report['collision_rate'] == 1 - 16 / report['n_ngrams']
@@ -0,0 +1,97 @@
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.stats import randint
+from sklearn.datasets import make_classification
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import GridSearchCV
+from sklearn.neural_network import MLPClassifier
+from sklearn.svm import LinearSVC
+from sklearn.tree import DecisionTreeClassifier
+
+from fold_cache import FoldCache
+from model_search import ExperimentRunner, candidate_times, epoch_curve, halving_random_search, regularization_path
+
+
+def make_data(n_samples=300):
+    X, y = make_classification(n_samples, 8, random_state=0)
+    return pd.DataFrame(X), pd.Series(np.where(y == 1, 'positive', 'negative'))
+
+
+def test_experiment_runner_matches_grid_search_and_resumes(tmp_path):
+    X, y = make_data()
+    space = {'alpha': [1e-4, 1e-2]}
+    estimator = MLPClassifier(hidden_layer_sizes=(10,), max_iter=30, random_state=0)
+    with FoldCache(X, y).share() as folds:
+        runner = ExperimentRunner(estimator, str(tmp_path), n_jobs=2)
+        results = runner.run(space, folds)
+        resumed = runner.run(space, folds)
+
+    grid = GridSearchCV(estimator, space, cv=5, scoring='roc_auc').fit(X, y)
+    np.testing.assert_allclose(results['val_auc'], grid.cv_results_['mean_test_score'])
+    pd.testing.assert_frame_equal(resumed, results)
+    assert runner.cache_info() == {'resumed': 2, 'ran': 2}
+
+
+def test_regularization_path_keeps_the_fitted_models():
+    X, y = make_data(400)
+    C_values = [0.01, 0.1, 1.0]
+    with FoldCache(X[:300], y[:300]).share() as folds:
+        X_val = folds.as_array(X[300:])
+        models, path = regularization_path(LinearSVC(random_state=0), folds, X_val, y[300:], C_values, n_jobs=2)
+
+    for C, model, auc in zip(C_values, models, path['AUC-ROC']):
+        expected = LinearSVC(C=C, random_state=0).fit(X[:300].to_numpy(), y[:300])
+        np.testing.assert_allclose(model.coef_, expected.coef_)
+        assert auc == roc_auc_score(y[300:], expected.decision_function(X_val))
+
+
+def test_epoch_curve_advances_the_shuffle_and_stops_like_fit():
+    X, y = make_data(400)
+    estimator = MLPClassifier(hidden_layer_sizes=(10,), solver='sgd', random_state=3)
+    model, curve = epoch_curve(estimator, X[:300], y[:300], X[300:], y[300:], [1, 5, 2000])
+
+    # The first epoch is the same as fit, the next ones do not replay the minibatch shuffle of the int seed
+    first = MLPClassifier(**dict(estimator.get_params(), max_iter=1)).fit(X[:300], y[:300])
+    assert curve['val_auc'][0] == roc_auc_score(y[300:], first.predict_proba(X[300:])[:, 1])
+    replayed = MLPClassifier(**estimator.get_params())
+    for _ in range(5):
+        replayed.partial_fit(X[:300], y[:300], classes=np.unique(y))
+    five_epochs, _ = epoch_curve(estimator, X[:300], y[:300], X[300:], y[300:], [5])
+    assert not np.allclose(five_epochs.coefs_[0], replayed.coefs_[0])
+
+    # The training loss converged before the last checkpoint
+    assert list(curve['epoch']) == [1, 5, 2000]
+    assert curve['n_iter'].iloc[-1] < 2000
+    assert len(model.loss_curve_) == curve['n_iter'].iloc[-1]
+
+
+def test_candidate_times_keeps_repeated_draws_apart():
+    X, y = make_data(600)
+    search = halving_random_search(DecisionTreeClassifier(random_state=0), {'max_depth': randint(2, 4)}, X, y,
+                                   n_candidates=9, cv=3, n_jobs=1)
+    times = candidate_times(search)
+    # Only two distinct settings among the nine draws
+    assert times.index.nunique() == 2
+    assert len(times) == 9
+    assert times['rounds'].sum() == len(search.cv_results_['params'])
+    assert (times['rounds'] == 3).sum() == 1
+
+
+def test_fold_cache_leaves_the_data_writeable():
+    X_array, y_array = make_classification(300, 8, random_state=0)
+    folds = FoldCache(X_array, y_array)
+    X_array[0, 0] = 1
+    y_array[0] = 1 - y_array[0]
+    assert not folds.X.flags.writeable
+    assert folds.X[0, 0] != 1
+
+
+def test_fold_cache_close_removes_the_shared_files():
+    X, y = make_data()
+    with FoldCache(X, y).share() as folds:
+        shared_dir = folds.shared_dir
+        assert len(os.listdir(shared_dir)) == 2 + 2 * folds.n_splits
+    assert not os.path.exists(shared_dir)
+    assert folds.X is None
@@ -0,0 +1,36 @@
+import pandas as pd
+
+from stemming import CachedStemmer
+from text_cleaning import clean_texts, clean_texts_vectorized, tokenize_and_count
+
+TEXTS = ['I love this naïve café!!', 'Worst day ever... 123 times', 'Ça va? très bien, merci',
+         'the the the a b 42x', '', 'Déjà vu: running, runs, ran', 'happy happy joy joy']
+
+
+def test_vectorized_cleaning_matches_single_pass():
+    # Duplicated labels and the default str dtype of the text column, which is pyarrow backed on pandas 3
+    texts = pd.Series(TEXTS * 3, index=list(range(len(TEXTS))) * 3, dtype='str')
+    for h_pct, l_pct in [(0.05, 0.05), (0.0, 0.0), (0.2, 0.1)]:
+        expected = clean_texts(texts, h_pct=h_pct, l_pct=l_pct)
+        result = clean_texts_vectorized(texts, h_pct=h_pct, l_pct=l_pct)
+        assert list(result) == list(expected)
+        assert list(result.index) == list(expected.index)
+
+
+def test_cleaning_keeps_non_ascii_words():
+    texts = pd.Series(['naïve naïve café café'], dtype='str')
+    assert clean_texts_vectorized(texts, h_pct=0, l_pct=0).iloc[0] == clean_texts(texts, h_pct=0, l_pct=0).iloc[0]
+    assert 'naïv' in clean_texts_vectorized(texts, h_pct=0, l_pct=0).iloc[0]
+
+
+def test_parallel_tokenizing_warms_the_stem_cache():
+    texts = TEXTS * 20
+    serial_stemmer = CachedStemmer()
+    serial_tokens, serial_index = tokenize_and_count(texts, serial_stemmer, n_jobs=1, chunk_size=10)
+    parallel_stemmer = CachedStemmer()
+    parallel_tokens, parallel_index = tokenize_and_count(texts, parallel_stemmer, n_jobs=2, chunk_size=10)
+
+    assert parallel_tokens == serial_tokens
+    assert parallel_index.ranked_words() == serial_index.ranked_words()
+    assert dict(parallel_stemmer.cache) == dict(serial_stemmer.cache)
+    assert parallel_stemmer.cache_info() == serial_stemmer.cache_info()
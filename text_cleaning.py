@@ -0,0 +1,112 @@
+import re
+from functools import partial
+
+import pandas as pd
+from nltk import SnowballStemmer
+
+from parallel import chunk_slices, map_chunks, resolve_n_jobs
+from stemming import CachedStemmer
+from word_frequency import WordFrequencyIndex
+
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+
+
+# 1. Single-pass tokenizer -------------------------------------------------------------------------------------------->
+
+def tokenize_text(text, stem):
+    # Lowercase and split once, then apply stemming, punctuation, numbers and 1-letter filters on the token stream
+    tokens = []
+    for word in text.lower().split():
+        for token in PUNCTUATION_PATTERN.sub(' ', stem(word)).split():
+            if not token.isdigit() and len(token) > 1:
+                tokens.append(token)
+    return tokens
+
+
+# 2. Clean text columns ----------------------------------------------------------------------------------------------->
+
+def tokenize_texts(texts, stemmer=None):
+    if stemmer is None:
+        stemmer = SnowballStemmer('english')
+    return [tokenize_text(text, stemmer.stem) for text in texts]
+
+
+def tokenize_chunk(texts, stemmer=None):
+    token_lists = tokenize_texts(texts, stemmer)
+    return token_lists, WordFrequencyIndex.from_token_lists(token_lists)
+
+
+def tokenize_chunk_cached(texts, stemmer=None):
+    # Tokenize in a worker process with a new stem cache, which is returned so the caller can merge it
+    cached_stemmer = CachedStemmer(stemmer, maxsize=None)
+    token_lists, frequency_index = tokenize_chunk(texts, cached_stemmer)
+    return token_lists, frequency_index, cached_stemmer
+
+
+def tokenize_and_count(texts, stemmer=None, n_jobs=1, chunk_size=10000):
+    # Tokenize blocks of rows in a process pool and merge the word counts of the blocks in order (map-reduce),
+    # so the tokens and the frequency ranking are the same as with a single process
+    texts = list(texts)
+    chunks = [texts[rows] for rows in chunk_slices(len(texts), chunk_size)]
+    token_lists = []
+    frequency_index = WordFrequencyIndex()
+    if isinstance(stemmer, CachedStemmer) and resolve_n_jobs(n_jobs) > 1 and len(chunks) > 1:
+        # The workers get the plain stemmer instead of a copy of the whole cache, and the words they stemmed are
+        # merged back into the cache
+        results = map_chunks(partial(tokenize_chunk_cached, stemmer=stemmer.stemmer), chunks, n_jobs)
+        for _, _, worker_stemmer in results:
+            stemmer.merge(worker_stemmer)
+    else:
+        results = map_chunks(partial(tokenize_chunk, stemmer=stemmer), chunks, n_jobs)
+    for chunk_token_lists, chunk_index, *_ in results:
+        token_lists.extend(chunk_token_lists)
+        frequency_index.merge(chunk_index)
+    return token_lists, frequency_index
+
+
+def clean_token_lists(token_lists, stop_words):
+    # Remove the frequency stop words and join the remaining tokens with single spaces
+    return [' '.join(token for token in tokens if token not in stop_words) for tokens in token_lists]
+
+
+# The whole-column cleaners are kept as a library API for cleaning a text column outside the pipeline,
+# FeaturePipeline tokenizes with tokenize_and_count and removes the stop words with clean_token_lists
+
+def clean_texts(texts, stemmer=None, h_pct=0.05, l_pct=0.05, frequency_index=None):
+    # Tokenize every message once and keep the tokens until the final join
+    token_lists = tokenize_texts(texts, stemmer)
+
+    # Remove the top $h_pct of the most frequent words and the top $l_pct of the least frequent words
+    if frequency_index is None:
+        frequency_index = WordFrequencyIndex.from_token_lists(token_lists)
+    stop_words = frequency_index.stop_words(h_pct, l_pct)
+
+    return pd.Series(clean_token_lists(token_lists, stop_words), index=texts.index, dtype=object)
+
+
+def clean_texts_vectorized(texts, stemmer=None, h_pct=0.05, l_pct=0.05, frequency_index=None):
+    if stemmer is None:
+        stemmer = SnowballStemmer('english')
+
+    # Work on positions so duplicated index labels are not merged by the groupby below
+    positions = texts.reset_index(drop=True)
+
+    # Lowercase and stem every distinct word once
+    words = positions.str.lower().str.split().explode().dropna()
+    unique_words = pd.unique(words)
+    words = words.map(dict(zip(unique_words, map(stemmer.stem, unique_words))))
+
+    # Remove punctuation, numbers and words with 1 letter with the str accessor
+    # The object dtype keeps the python regex engine, the pyarrow backed str dtype matches \w in ASCII only
+    tokens = words.astype(object).str.replace(PUNCTUATION_PATTERN.pattern, ' ', regex=True)
+    tokens = tokens.str.split().explode().dropna()
+    tokens = tokens[~tokens.str.isdigit() & (tokens.str.len() > 1)]
+
+    # Remove the top $h_pct of the most frequent words and the top $l_pct of the least frequent words
+    if frequency_index is None:
+        frequency_index = WordFrequencyIndex(tokens.value_counts().to_dict())
+    tokens = tokens[~tokens.isin(frequency_index.stop_words(h_pct, l_pct))]
+
+    clean = tokens.groupby(level=0, sort=False).agg(' '.join).reindex(positions.index, fill_value='')
+    clean.index = texts.index
+    return clean
@@ -0,0 +1,124 @@
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+TIME_STATISTICS = ['mean', 'median', 'std', 'burstiness']
+DATE_LIST_COLUMNS = ['previous_messages_dates', 'date_of_new_follower', 'date_of_new_follow']
+
+
+class RaggedDates:
+    # CSR-style storage of a column of date lists: the dates of row i are values[offsets[i]:offsets[i + 1]]
+    def __init__(self, offsets, values, index=None):
+        self.offsets = offsets
+        self.values = values
+        self.index = index if index is not None else pd.RangeIndex(len(offsets) - 1)
+
+    @classmethod
+    def from_lists(cls, date_lists):
+        # Explode the lists into one flat datetime array, parsed once with the fixed format. Missing lists (None or
+        # NaN) are empty
+        index = date_lists.index if isinstance(date_lists, pd.Series) else None
+        date_lists = [() if pd.api.types.is_scalar(dates) else dates for dates in date_lists]
+        lengths = np.fromiter((len(dates) for dates in date_lists), dtype=np.int64, count=len(date_lists))
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        values = pd.to_datetime(pd.Series(list(chain.from_iterable(date_lists)), dtype=object), format=DATE_FORMAT)
+        return cls(offsets, values.to_numpy(dtype='datetime64[s]'), index)
+
+    @classmethod
+    def from_arrow(cls, date_lists, index=None):
+        # An arrow list<timestamp> column (or a Series of its pd.ArrowDtype) is already stored as offsets + values, so
+        # they are taken as they are instead of going through a Python object per row. Null lists are empty
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        if isinstance(date_lists, pd.Series):
+            index = date_lists.index if index is None else index
+            date_lists = pa.array(date_lists)
+        lengths = pc.list_value_length(date_lists).fill_null(0).to_numpy()
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        values = pc.list_flatten(date_lists).to_numpy().astype('datetime64[s]')
+        return cls(offsets, values, index)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.values[self.offsets[i]:self.offsets[i + 1]]
+
+    def counts(self):
+        return pd.Series(np.diff(self.offsets), index=self.index)
+
+    def nbytes(self):
+        return self.offsets.nbytes + self.values.nbytes
+
+
+def as_ragged_dates(date_lists):
+    # Arrow list columns (loaded from parquet) are read from their offsets and values, lists of date strings are parsed
+    if isinstance(date_lists, RaggedDates):
+        return date_lists
+    if isinstance(getattr(date_lists, 'dtype', None), pd.ArrowDtype):
+        return RaggedDates.from_arrow(date_lists)
+    return RaggedDates.from_lists(date_lists)
+
+
+def to_ragged_dates(df, columns=DATE_LIST_COLUMNS):
+    # Convert the list-valued date columns once and drop them from the frame
+    dates = {column: as_ragged_dates(df[column]) for column in columns if column in df.columns}
+    return df.drop(columns=list(dates)), dates
+
+
+def consecutive_time_differences(offsets, values):
+    # Absolute differences in seconds between consecutive dates, without the ones crossing two segments
+    seconds = values.astype(np.int64)
+    diffs = np.abs(np.diff(seconds)).astype(float)
+    segment_starts = offsets[1:-1]
+    crossing = segment_starts[(segment_starts > 0) & (segment_starts < len(seconds))] - 1
+    diffs = np.delete(diffs, crossing)
+
+    # Segment i has max(len_i - 1, 0) differences
+    diff_counts = np.maximum(np.diff(offsets) - 1, 0)
+    segment_ids = np.repeat(np.arange(len(diff_counts)), diff_counts)
+    return diffs, segment_ids, diff_counts
+
+
+def segment_median(diffs, segment_ids, diff_counts):
+    # Sort the differences inside each segment and average the middle one or two
+    order = np.lexsort((diffs, segment_ids))
+    sorted_diffs = diffs[order]
+    diff_offsets = np.concatenate([[0], np.cumsum(diff_counts)])[:-1]
+    has_diffs = diff_counts > 0
+    lower = diff_offsets + (diff_counts - 1) // 2
+    upper = diff_offsets + diff_counts // 2
+    median = np.full(len(diff_counts), np.nan)
+    median[has_diffs] = (sorted_diffs[lower[has_diffs]] + sorted_diffs[upper[has_diffs]]) / 2
+    return median
+
+
+def time_difference_statistics(dates, statistics=('mean',)):
+    # Timing statistics of the differences between consecutive dates of every row, NaN for rows with < 2 dates
+    dates = as_ragged_dates(dates)
+    diffs, segment_ids, diff_counts = consecutive_time_differences(dates.offsets, dates.values)
+
+    n = len(diff_counts)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.bincount(segment_ids, weights=diffs, minlength=n) / diff_counts
+        mean_of_squares = np.bincount(segment_ids, weights=diffs ** 2, minlength=n) / diff_counts
+        std = np.sqrt(np.maximum(mean_of_squares - mean ** 2, 0))
+
+        result = {}
+        for statistic in statistics:
+            if statistic == 'mean':
+                result['mean'] = mean
+            elif statistic == 'median':
+                result['median'] = segment_median(diffs, segment_ids, diff_counts)
+            elif statistic == 'std':
+                result['std'] = std
+            elif statistic == 'burstiness':
+                # (std - mean) / (std + mean): -1 for periodic, 0 for random and close to 1 for bursty messaging
+                result['burstiness'] = (std - mean) / (std + mean)
+            else:
+                raise ValueError(f"Unknown time statistic '{statistic}', expected one of {TIME_STATISTICS}")
+
+    return pd.DataFrame(result, index=dates.index)
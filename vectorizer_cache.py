@@ -0,0 +1,38 @@
+import hashlib
+import os
+import pickle
+
+
+class VectorizerCache:
+    # Fitted vectorizers and their output matrices saved on disk, keyed by a hash of the corpus and the
+    # vectorizer parameters, so repeated runs over the same cleaned text skip the tokenizing and fitting
+    def __init__(self, directory='vectorizer_cache'):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, vectorizer, texts):
+        digest = hashlib.sha256()
+        digest.update(type(vectorizer).__name__.encode())
+        digest.update(repr(sorted(vectorizer.get_params().items())).encode())
+        for text in texts:
+            digest.update(text.encode())
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def fit_transform(self, vectorizer, texts):
+        path = os.path.join(self.directory, f'{self.key(vectorizer, texts)}.pkl')
+        if os.path.exists(path):
+            self.hits += 1
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+
+        self.misses += 1
+        matrix = vectorizer.fit_transform(texts)
+        os.makedirs(self.directory, exist_ok=True)
+        with open(path, 'wb') as f:
+            pickle.dump((vectorizer, matrix), f)
+        return vectorizer, matrix
+
+    def cache_info(self):
+        return {'hits': self.hits, 'misses': self.misses}
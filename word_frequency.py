@@ -0,0 +1,73 @@
+import pickle
+from collections import Counter
+
+
+class WordFrequencyIndex:
+    # Term frequencies of a tokenized corpus, built in one streaming pass
+    def __init__(self, counts=None):
+        self.counts = Counter(counts) if counts is not None else Counter()
+        self.total = sum(self.counts.values())
+        self._ranked_words = None
+
+    @classmethod
+    def from_token_lists(cls, token_lists):
+        index = cls()
+        for tokens in token_lists:
+            index.update(tokens)
+        return index
+
+    def update(self, tokens):
+        for token in tokens:
+            self.counts[token] += 1
+            self.total += 1
+        self._ranked_words = None
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+        self.total += other.total
+        self._ranked_words = None
+        return self
+
+    def discard(self, words):
+        for word in words:
+            self.total -= self.counts.pop(word, 0)
+        self._ranked_words = None
+
+    def __contains__(self, word):
+        return word in self.counts
+
+    def __len__(self):
+        return len(self.counts)
+
+    def ranked_words(self):
+        # Words sorted from the most to the least frequent, ties kept in first-seen order
+        if self._ranked_words is None:
+            self._ranked_words = [word for word, _ in self.counts.most_common()]
+        return self._ranked_words
+
+    def most_frequent(self, pct):
+        # The top $pct of the most frequent words
+        return set(self.ranked_words()[:int(self.total * pct / 100)])
+
+    def least_frequent(self, pct):
+        # The top $pct of the least frequent words, walking the ranking from its end
+        n = int(self.total * pct / 100)
+        if n == 0:
+            return set()
+        return set(self.ranked_words()[:-n:-1])
+
+    def stop_words(self, h_pct=0.05, l_pct=0.05):
+        # The least frequent words are counted after the most frequent ones were removed
+        high_freq = self.most_frequent(h_pct)
+        remaining = WordFrequencyIndex(self.counts)
+        remaining.discard(high_freq)
+        return high_freq | remaining.least_frequent(l_pct)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            pickle.dump(dict(self.counts), f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls(pickle.load(f))